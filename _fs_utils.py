@@ -0,0 +1,97 @@
+"""Shared directory-traversal helpers for make_cbz and find_unpadded_sequences.
+
+Both tools need the same thing: the "leaf" directories of a tree (directories
+whose files are not shadowed by files in any descendant directory), together
+with the file entries found there. This module walks the tree exactly once
+with os.scandir and answers both questions from that single pass.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+def _scandir_recursive(path: str, files_out: Dict[str, List[os.DirEntry]],
+                       subtree_out: Dict[str, bool]) -> bool:
+    """Recursively scan path with a single os.scandir pass per directory.
+
+    Records each directory's non-hidden file entries in files_out and, in
+    subtree_out, whether any descendant directory (not path itself) contains
+    such a file. Hidden subtrees (.git, .venv, ...) are pruned without being
+    descended into. Symlinks are not followed.
+    """
+    files: List[os.DirEntry] = []
+    below = False
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_symlink() or entry.name.startswith('.'):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                _scandir_recursive(entry.path, files_out, subtree_out)
+                below = below or subtree_out[entry.path] or bool(files_out[entry.path])
+            elif entry.is_file(follow_symlinks=False):
+                files.append(entry)
+    files_out[path] = files
+    subtree_out[path] = below
+    return below
+
+
+def subtree_has_files(path: Path) -> bool:
+    """Return True if any directory below path (not path itself) contains a
+    non-hidden file."""
+    files: Dict[str, List[os.DirEntry]] = {}
+    subtree: Dict[str, bool] = {}
+    return _scandir_recursive(os.fspath(path), files, subtree)
+
+
+def walk_leafs(root: Path, include_empty: bool = False) -> List[Tuple[Path, List[os.DirEntry]]]:
+    """Return (directory, file entries) tuples for the leaf directories under root.
+
+    A directory is a leaf if it contains files directly and no descendant
+    directory contains any. Hidden files are ignored throughout. If
+    include_empty is True, directories with zero files (and none below) are
+    also returned.
+    """
+    files: Dict[str, List[os.DirEntry]] = {}
+    subtree: Dict[str, bool] = {}
+    _scandir_recursive(os.fspath(root), files, subtree)
+
+    leafs: List[Tuple[Path, List[os.DirEntry]]] = []
+    for path, entries in files.items():
+        if subtree[path]:
+            continue
+        if entries or include_empty:
+            leafs.append((Path(path), entries))
+    return leafs
+
+
+def walk_leaf_names(root: Path) -> List[Tuple[Path, List[str]]]:
+    """Like walk_leafs, but returns file names and traverses with os.fwalk.
+
+    fwalk descends by directory file descriptor, so deep trees are scanned
+    without the kernel re-resolving the path prefix at every level. Suited to
+    callers that only need names; there are no DirEntry objects (and hence no
+    cached stat results) on this path. Falls back to walk_leafs on platforms
+    without os.fwalk.
+    """
+    if not hasattr(os, 'fwalk'):
+        return [(d, [e.name for e in entries]) for d, entries in walk_leafs(root)]
+
+    # Top-down so hidden subtrees are pruned before descent; the child
+    # aggregates are then computed in reverse (children precede parents there)
+    walked = []
+    for dirpath, dirnames, filenames, _dirfd in os.fwalk(root, follow_symlinks=False):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        walked.append((dirpath, list(dirnames),
+                       [f for f in filenames if not f.startswith('.')]))
+
+    subtree: Dict[str, bool] = {}
+    leafs: List[Tuple[Path, List[str]]] = []
+    for dirpath, dirnames, names in reversed(walked):
+        # .get covers unvisited children such as symlinked directories
+        child_has = any(subtree.get(os.path.join(dirpath, d), False) for d in dirnames)
+        subtree[dirpath] = child_has or bool(names)
+        if names and not child_has:
+            leafs.append((Path(dirpath), names))
+    return leafs
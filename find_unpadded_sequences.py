@@ -13,24 +13,39 @@ the width of the largest number in the sequence).
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
+import os
 import re
 import sys
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+from _fs_utils import subtree_has_files, walk_leaf_names
 
-NUM_RE = re.compile(r"(\d+)")
+try:
+    # Optional: C-level min/max/unique for very large directories
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this many entries the NumPy conversion overhead outweighs the gain
+_NUMPY_MIN_ENTRIES = 4096
+
+
+# Anchored at the end: finds the last numeric token in one match without
+# materializing every numeric run in the name.
+LAST_NUM_RE = re.compile(r"(\d+)(\D*)$")
 
 
 def extract_number_token(name: str) -> Optional[Tuple[int, str]]:
     """Return (int_value, token_str) for the last numeric token in the name,
     or None if no numeric token found.
     """
-    m = NUM_RE.findall(name)
+    m = LAST_NUM_RE.search(name)
     if not m:
         return None
-    s = m[-1]
+    s = m.group(1)
     return int(s), s
 
 
@@ -38,53 +53,65 @@ def is_leaf_dir(d: Path) -> bool:
     """A directory is a leaf if none of its subdirectories contain files."""
     if not d.is_dir():
         return False
-    for sub in d.iterdir():
-        if sub.is_dir():
-            # If this subdirectory (or any nested dir) has any file, d is not leaf
-            for p in sub.rglob('*'):
-                if p.is_file():
-                    return False
-    return True
+    return not subtree_has_files(d)
 
 
-def analyze_dir(d: Path, min_files: int = 2):
-    files = [p for p in sorted(d.iterdir()) if p.is_file() and not p.name.startswith('.')]
+def analyze_dir(d: Path, min_files: int = 2, files: Optional[List[Path]] = None):
+    if files is None:
+        files = [p for p in d.iterdir() if p.is_file() and not p.name.startswith('.')]
     if len(files) < min_files:
         return None
 
-    entries = []  # tuples (path, int_value, token_str)
+    entries = []  # tuples (path, int_value, token_str, token_start_in_stem)
     for p in files:
-        res = extract_number_token(p.stem)
-        if res is None:
+        m = LAST_NUM_RE.search(p.stem)
+        if m is None:
             continue
-        val, token = res
-        entries.append((p, val, token))
+        token = m.group(1)
+        entries.append((p, int(token), token, m.start(1)))
 
     if len(entries) < min_files:
         return None
 
-    # Sort orders
-    lex_order = [e[0].name for e in sorted(entries, key=lambda x: x[0].name)]
-    numeric_order = [e[0].name for e in sorted(entries, key=lambda x: (x[1], x[0].name))]
-
     nums = [e[1] for e in entries]
-    min_n, max_n = min(nums), max(nums)
+    token_lengths = [len(e[2]) for e in entries]
+    use_numpy = np is not None and len(entries) > _NUMPY_MIN_ENTRIES
 
-    # Are numbers consecutive?
-    expected_count = max_n - min_n + 1
-    unique_nums = sorted(set(nums))
-    consecutive = (expected_count == len(unique_nums) and unique_nums == list(range(min_n, max_n + 1)))
+    # Are numbers consecutive? (duplicates also fail this check)
+    if use_numpy:
+        arr = np.fromiter(nums, dtype=np.int64, count=len(nums))
+        min_n, max_n = int(arr.min()), int(arr.max())
+        consecutive = (np.unique(arr).size == arr.size == max_n - min_n + 1)
+    else:
+        min_n, max_n = min(nums), max(nums)
+        consecutive = (len(set(nums)) == len(nums) == max_n - min_n + 1)
 
     if not consecutive:
         return None
 
-    # Determine padding consistency
-    token_lengths = [len(e[2]) for e in entries]
+    # Determine padding consistency. Uniformly padded tokens at the desired
+    # width sort identically lex and numerically, so the common already-padded
+    # case returns before any sorting happens.
+    if use_numpy:
+        lens = np.fromiter(token_lengths, dtype=np.int16, count=len(token_lengths))
+        uniform = int(lens.min()) == int(lens.max())
+    else:
+        uniform = len(set(token_lengths)) == 1
     desired_width = len(str(max_n))
-    fully_padded = (len(set(token_lengths)) == 1 and token_lengths[0] == desired_width)
+    fully_padded = (uniform and token_lengths[0] == desired_width)
+    if fully_padded:
+        return None
 
-    # If lexicographic order differs from numeric order and not fully padded => report
-    if lex_order != numeric_order and not fully_padded:
+    # One sort by name is enough: numeric order disagrees with it iff the
+    # numeric keys are not non-decreasing along the name-sorted entries
+    lex_order = sorted(entries, key=lambda x: x[0].name)
+    orders_match = all((a[1], a[0].name) <= (b[1], b[0].name)
+                       for a, b in zip(lex_order, lex_order[1:]))
+
+    # If lexicographic order differs from numeric order => report. The
+    # numeric sample only needs the first 10 entries, so nsmallest avoids
+    # materializing a second fully sorted list.
+    if not orders_match:
         return {
             'dir': str(d),
             'count': len(entries),
@@ -92,8 +119,11 @@ def analyze_dir(d: Path, min_files: int = 2):
             'max': max_n,
             'desired_width': desired_width,
             'token_lengths_sample': sorted(set(token_lengths)),
-            'lex_order_sample': lex_order[:10],
-            'numeric_order_sample': numeric_order[:10],
+            'lex_order_sample': [e[0].name for e in lex_order[:10]],
+            'numeric_order_sample': [e[0].name for e in heapq.nsmallest(
+                10, entries, key=lambda x: (x[1], x[0].name))],
+            # Internal: lets rename mode reuse this pass instead of re-scanning
+            '_entries': [(str(p), val, token, start) for p, val, token, start in entries],
         }
 
     return None
@@ -102,13 +132,10 @@ def analyze_dir(d: Path, min_files: int = 2):
 def find_problem_dirs(root: Path, min_files: int = 2) -> List[dict]:
     root = root.resolve()
     results = []
-    # Include root itself and all subdirectories
-    dirs = [p for p in [root] + [p for p in root.rglob('*') if p.is_dir()]]
-
-    for d in dirs:
-        if not is_leaf_dir(d):
-            continue
-        res = analyze_dir(d, min_files=min_files)
+    # Single fd-based pass over the whole tree; per-leaf file names are
+    # reused by analyze_dir so no directory is scanned twice.
+    for d, names in walk_leaf_names(root):
+        res = analyze_dir(d, min_files=min_files, files=[d / n for n in names])
         if res:
             results.append(res)
 
@@ -118,13 +145,12 @@ def find_problem_dirs(root: Path, min_files: int = 2) -> List[dict]:
 def make_new_name(old: Path, width: int) -> Path:
     """Return new Path for old by zero-padding the last numeric token in the stem."""
     stem = old.stem
-    m = NUM_RE.findall(stem)
+    m = LAST_NUM_RE.search(stem)
     if not m:
         return old
-    last = m[-1]
-    padded = last.zfill(width)
-    # replace last occurrence of the digit sequence
-    new_stem = re.sub(r"(\d+)(?!.*\d)", padded, stem)
+    padded = m.group(1).zfill(width)
+    # splice the padded token back in place of the last digit run
+    new_stem = stem[:m.start(1)] + padded + stem[m.end(1):]
     return old.with_name(new_stem + old.suffix)
 
 
@@ -137,11 +163,34 @@ def perform_renames(mapping: List[Tuple[Path, Path]], dry_run: bool = True, forc
     if len(dsts) != len(set(dsts)):
         raise RuntimeError("Duplicate destination filenames detected; aborting to avoid data loss.")
 
-    # Check for existing files that are not in the source set
-    srcs = set([src.resolve() for src, _ in mapping])
-    for _src, dst in mapping:
-        if dst.exists() and dst.resolve() not in srcs and not force:
-            raise RuntimeError(f"Destination {dst} already exists and --force not given")
+    # Check for existing files that are not in the source set. One scandir per
+    # destination directory replaces a stat syscall per file, and every
+    # realpath is resolved at most once via the cache below.
+    srcs_real = {os.path.realpath(os.fspath(src)) for src, _ in mapping}
+    _real_cache: Dict[str, str] = {}
+
+    def _real(p: Path) -> str:
+        s = os.fspath(p)
+        r = _real_cache.get(s)
+        if r is None:
+            r = _real_cache[s] = os.path.realpath(s)
+        return r
+
+    existing_by_parent: Dict[Path, set] = {}
+    if not force:
+        by_parent: Dict[Path, List[Path]] = {}
+        for _src, dst in mapping:
+            by_parent.setdefault(dst.parent, []).append(dst)
+        for parent, parent_dsts in by_parent.items():
+            try:
+                with os.scandir(parent) as it:
+                    existing = {e.name for e in it}
+            except FileNotFoundError:
+                existing = set()
+            existing_by_parent[parent] = existing
+            for dst in parent_dsts:
+                if dst.name in existing and _real(dst) not in srcs_real:
+                    raise RuntimeError(f"Destination {dst} already exists and --force not given")
 
     if dry_run:
         print("Dry-run mapping (no changes):")
@@ -149,22 +198,28 @@ def perform_renames(mapping: List[Tuple[Path, Path]], dry_run: bool = True, forc
             print(f"{src} -> {dst}")
         return 0, 0
 
-    # Perform two-phase rename to avoid collisions: src -> temp, then temp -> final
-    import uuid
+    # Perform two-phase rename to avoid collisions: src -> temp, then temp -> final.
+    # pid + counter is unique enough within a batch; no need for uuid4's
+    # per-file urandom read and 32-char hex string.
+    prefix = f".renametmp-{os.getpid()}-"
 
     temp_map = []
     try:
-        for src, dst in mapping:
-            temp = src.with_name(src.name + f".renametmp-{uuid.uuid4().hex}")
-            src.rename(temp)
+        for i, (src, dst) in enumerate(mapping):
+            temp = src.with_name(f"{src.name}{prefix}{i}")
+            os.rename(os.fspath(src), os.fspath(temp))
             temp_map.append((temp, dst))
 
+        # Ensure destination parents exist, once per directory rather than per file
+        for parent in {dst.parent for _temp, dst in temp_map}:
+            parent.mkdir(parents=True, exist_ok=True)
+
         for temp, dst in temp_map:
-            if dst.exists() and dst.resolve() not in srcs and not force:
+            # Re-check against the pre-scanned name sets instead of statting again
+            if not force and dst.name in existing_by_parent.get(dst.parent, ()) \
+                    and _real(dst) not in srcs_real:
                 raise RuntimeError(f"Destination {dst} exists; aborting")
-            # Ensure parent exists
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            temp.rename(dst)
+            os.rename(os.fspath(temp), os.fspath(dst))
             succeeded += 1
 
     except Exception as exc:
@@ -191,7 +246,8 @@ def main(argv=None):
     root = args.root
     results = find_problem_dirs(root, min_files=args.min_files)
     if args.json:
-        print(json.dumps(results, indent=2))
+        public = [{k: v for k, v in r.items() if not k.startswith('_')} for r in results]
+        print(json.dumps(public, indent=2))
         return 0
 
     if not results:
@@ -207,29 +263,25 @@ def main(argv=None):
             print('')
         return 0
 
-    # Rename mode
+    # Rename mode: reuse the entries gathered by the analysis pass rather than
+    # re-scanning and re-matching every directory
     all_mappings = []
     for r in results:
         d = Path(r['dir'])
-        # Recompute entries in case of omitted files
-        files = [p for p in sorted(d.iterdir()) if p.is_file() and not p.name.startswith('.')]
-        entries = []
-        for p in files:
-            res = extract_number_token(p.stem)
-            if res is None:
-                continue
-            val, token = res
-            entries.append((p, val, token))
+        entries = r['_entries']
         if not entries:
             continue
-        max_n = max([e[1] for e in entries])
-        width = args.width if args.width is not None else len(str(max_n))
+        width = args.width if args.width is not None else r['desired_width']
 
         mappings = []
-        for src, val, token in entries:
-            dst = make_new_name(src, width)
-            if src.resolve() != dst.resolve():
-                mappings.append((src, dst))
+        for path_str, _val, token, start in entries:
+            padded = token.zfill(width)
+            if padded == token:
+                continue
+            src = Path(path_str)
+            stem = src.stem
+            dst = src.with_name(stem[:start] + padded + stem[start + len(token):] + src.suffix)
+            mappings.append((src, dst))
 
         if mappings:
             print(f"Directory: {d} -> will rename {len(mappings)} files (width={width})")
@@ -16,64 +16,108 @@ Designed to be cross-platform and run with Python 3.6+.
 from __future__ import annotations
 
 import argparse
+import concurrent.futures
 import os
+import shutil
 import sys
 import zipfile
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
 
+from _fs_utils import walk_leafs
 
-def find_leaf_dirs(root: Path, include_empty: bool = False) -> List[Path]:
-    """Return a list of directories under root that are "leaf" directories.
+try:
+    # python-isal offers a SIMD-accelerated drop-in for zlib; swapping it in
+    # makes zipfile's DEFLATE compressobj 2-4x faster at the same ratio.
+    # Optional: without it the stdlib zlib is used as before.
+    from isal import isal_zlib
+
+    zipfile.zlib = isal_zlib
+except ImportError:
+    pass
+
+# Formats that are already compressed: DEFLATE gains ~nothing on these, so
+# archives of them are stored uncompressed.
+PRECOMPRESSED_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.avif', '.heic'}
+
+
+def find_leaf_dirs(root: Path, include_empty: bool = False) -> List[Tuple[Path, List[os.DirEntry]]]:
+    """Return (directory, file entries) tuples for "leaf" directories under root.
 
     A directory is a leaf if the total number of files under it equals the
     number of files directly in it (i.e., no files in descendant subdirs).
     If include_empty is True, directories with zero files are considered.
+    The DirEntry list holds the non-hidden files directly in the leaf, so
+    callers can reuse entry.stat() results instead of re-statting paths.
     """
-    leafs: List[Path] = []
     if not root.exists():
         raise FileNotFoundError(f"Root path {root!s} does not exist")
 
-    for dirpath, dirnames, filenames in os.walk(root):
-        cur_dir = Path(dirpath)
-        direct_files_count = len([f for f in filenames if not f.startswith('.')])
-        if direct_files_count == 0 and not include_empty:
-            # skip directories that have no files directly unless include_empty
-            continue
-
-        # Count all files under this directory (including itself)
-        total_files = 0
-        for _root, _dirs, _files in os.walk(cur_dir):
-            total_files += len([f for f in _files if not f.startswith('.')])
+    return walk_leafs(root, include_empty=include_empty)
 
-        if total_files == direct_files_count:
-            # no files in descendant directories => leaf
-            leafs.append(cur_dir)
 
-    return leafs
+def unique_archive_path(base_name: str, dest_dir: Path,
+                        assigned: Optional[set] = None) -> Path:
+    """Return the first free <base_name>.cbz / <base_name>_N.cbz path in dest_dir.
 
-
-def make_cbz_for_dir(src_dir: Path, dest_dir: Path) -> Path:
-    """Create a .cbz file for src_dir inside dest_dir and return the path."""
-    base_name = src_dir.name or "root"
+    assigned is an optional set of paths already promised to other archives in
+    this run (and is updated with the returned path); callers that create
+    archives concurrently must pick their paths through it up front, since the
+    exists() probe alone cannot see archives other workers are still writing.
+    """
     candidate = dest_dir / f"{base_name}.cbz"
     counter = 1
-    while candidate.exists():
+    while candidate.exists() or (assigned is not None and candidate in assigned):
         candidate = dest_dir / f"{base_name}_{counter}.cbz"
         counter += 1
+    if assigned is not None:
+        assigned.add(candidate)
+    return candidate
+
+
+def make_cbz_for_dir(src_dir: Path, dest_dir: Path,
+                     files: Optional[List[Tuple[str, str]]] = None,
+                     archive_path: Optional[Path] = None) -> Path:
+    """Create a .cbz file for src_dir inside dest_dir and return the path.
+
+    files is an optional list of (path, arcname) pairs, typically derived from
+    the DirEntry list returned by find_leaf_dirs; when omitted the directory
+    is scanned here. archive_path is the pre-picked output path; when omitted
+    a collision-free name is probed here (only safe for standalone use).
+    """
+    if archive_path is not None:
+        candidate = archive_path
+    else:
+        candidate = unique_archive_path(src_dir.name or "root", dest_dir)
 
     # Ensure destination directory exists
     dest_dir.mkdir(parents=True, exist_ok=True)
 
-    # Files directly in src_dir (ignore hidden files by default)
-    files = [p for p in src_dir.iterdir() if p.is_file() and not p.name.startswith('.')]
-
-    # Create the zip
-    compression = zipfile.ZIP_DEFLATED
-    with zipfile.ZipFile(candidate, mode='w', compression=compression) as zf:
-        for f in files:
-            # Put files at archive root with their basename
-            zf.write(f, arcname=f.name)
+    if files is None:
+        # Files directly in src_dir (ignore hidden files by default)
+        files = [(os.fspath(p), p.name) for p in src_dir.iterdir()
+                 if p.is_file() and not p.name.startswith('.')]
+
+    # Create the zip. Image files are stored as-is; anything else gets fast
+    # DEFLATE (level 1) -- the contents are typically incompressible anyway.
+    all_compressed = bool(files) and all(
+        os.path.splitext(arcname)[1].lower() in PRECOMPRESSED_SUFFIXES for _path, arcname in files)
+    compression = zipfile.ZIP_STORED if all_compressed else zipfile.ZIP_DEFLATED
+    with open(candidate, 'wb', buffering=1 << 20) as fh:
+        with zipfile.ZipFile(fh, mode='w', compression=compression,
+                             compresslevel=1, allowZip64=True) as zf:
+            if compression == zipfile.ZIP_STORED:
+                # Uncompressed entries are pure data movement: stream each file
+                # into the member in 1 MiB chunks instead of zf.write's small
+                # internal buffer
+                for path, arcname in files:
+                    info = zipfile.ZipInfo.from_file(path, arcname)
+                    with open(path, 'rb') as src, zf.open(info, 'w') as member:
+                        shutil.copyfileobj(src, member, 1 << 20)
+            else:
+                for path, arcname in files:
+                    # Put files at archive root with their basename
+                    zf.write(path, arcname=arcname)
 
     return candidate
 
@@ -104,37 +148,65 @@ def main(argv: List[str] | None = None) -> int:
         print(f"No leaf directories with files found under '{root}'. Nothing to do.")
         return 0
 
-    created = []
-    for d in leafs:
-        # Determine destination directory: either the provided output or the parent of the leaf
+    # Per-leaf jobs: (leaf dir, destination dir, file entries). Destination is
+    # either the provided output or the parent of the leaf.
+    jobs = []
+    for d, entries in leafs:
         dest_dir = output if output is not None else d.parent
+        jobs.append((d, dest_dir, entries))
+
+    # Final archive paths are picked here, sequentially, so same-named leafs
+    # get their _1, _2, ... suffixes even when the archives are written
+    # concurrently
+    assigned: set = set()
 
-        # If dry-run, just print
-        # Determine files and sizes for verbose/dry-run output
-        files = [p for p in d.iterdir() if p.is_file() and not p.name.startswith('.')]
-        total_bytes = sum([p.stat().st_size for p in files]) if files else 0
-
-        if args.dry_run:
-            print(f"Would create archive for: {d} -> {dest_dir / (d.name + '.cbz')}")
-            if args.verbose:
-                print(f"  Files ({len(files)}):")
-                for f in files:
-                    print(f"    - {f.name} ({f.stat().st_size} bytes)")
-                print(f"  Total bytes: {total_bytes}")
-            continue
-
-        if args.verbose:
-            print(f"Creating archive for: {d} -> {dest_dir / (d.name + '.cbz')}")
+    created = []
+    if args.dry_run or args.verbose:
+        # Keep dry-run/verbose sequential so per-directory output stays readable
+        for d, dest_dir, entries in jobs:
+            # One stat per entry (cached on the DirEntry); sizes are reused for
+            # both the verbose listing and the total
+            files = [(e.path, e.name, e.stat().st_size) for e in entries]
+            total_bytes = sum(size for _path, _name, size in files)
+
+            if args.dry_run:
+                print(f"Would create archive for: {d} -> {dest_dir / (d.name + '.cbz')}")
+                if args.verbose:
+                    print(f"  Files ({len(files)}):")
+                    for _path, name, size in files:
+                        print(f"    - {name} ({size} bytes)")
+                    print(f"  Total bytes: {total_bytes}")
+                continue
+
+            archive_path = unique_archive_path(d.name or "root", dest_dir, assigned)
+            print(f"Creating archive for: {d} -> {archive_path}")
             print(f"  Files ({len(files)}):")
-            for f in files:
-                print(f"    - {f.name} ({f.stat().st_size} bytes)")
+            for _path, name, size in files:
+                print(f"    - {name} ({size} bytes)")
             print(f"  Total bytes: {total_bytes}")
-        try:
-            dest = make_cbz_for_dir(d, dest_dir)
-            print(f"Created: {dest}  (from {d})")
-            created.append(dest)
-        except Exception as exc:
-            print(f"Failed to create archive for {d}: {exc}", file=sys.stderr)
+            try:
+                dest = make_cbz_for_dir(d, dest_dir, [(path, name) for path, name, _size in files],
+                                        archive_path=archive_path)
+                print(f"Created: {dest}  (from {d})")
+                created.append(dest)
+            except Exception as exc:
+                print(f"Failed to create archive for {d}: {exc}", file=sys.stderr)
+    else:
+        # Archives are independent and compression is CPU-bound, so fan the
+        # leaf directories out over one worker process per core
+        with concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            futures = {pool.submit(make_cbz_for_dir, d, dest_dir,
+                                   [(e.path, e.name) for e in entries],
+                                   unique_archive_path(d.name or "root", dest_dir, assigned)): d
+                       for d, dest_dir, entries in jobs}
+            for fut in concurrent.futures.as_completed(futures):
+                d = futures[fut]
+                try:
+                    dest = fut.result()
+                    print(f"Created: {dest}  (from {d})")
+                    created.append(dest)
+                except Exception as exc:
+                    print(f"Failed to create archive for {d}: {exc}", file=sys.stderr)
 
     if output is not None:
         print(f"Done. Created {len(created)} .cbz file(s) in '{output}'")
@@ -22,8 +22,8 @@ def test_analyze_dir_detects_unpadded(tmp_path):
     # create leaf dir
     d = tmp_path / 'leaf'
     d.mkdir()
-    # create unpadded sequence: 1,2,10
-    files = ['img1.jpg', 'img2.jpg', 'img10.jpg']
+    # create unpadded consecutive sequence: 1..10
+    files = [f'img{i}.jpg' for i in range(1, 11)]
     for f in files:
         touch(d / f)
 
@@ -33,6 +33,11 @@ def test_analyze_dir_detects_unpadded(tmp_path):
     assert res['max'] == 10
     # desired width should be 2 (since max is 10)
     assert res['desired_width'] == len(str(res['max']))
+    # lexicographic order misplaces img10 right after img1; numeric order doesn't
+    assert res['lex_order_sample'] == [
+        'img1.jpg', 'img10.jpg', 'img2.jpg', 'img3.jpg', 'img4.jpg',
+        'img5.jpg', 'img6.jpg', 'img7.jpg', 'img8.jpg', 'img9.jpg']
+    assert res['numeric_order_sample'] == [f'img{i}.jpg' for i in range(1, 11)]
 
 
 def test_make_new_name_and_perform_renames(tmp_path):
@@ -67,3 +72,58 @@ def test_make_new_name_and_perform_renames(tmp_path):
     expected = { (d / 'img01.jpg'), (d / 'img02.jpg'), (d / 'img10.jpg') }
     actual = set([p for p in d.iterdir() if p.is_file()])
     assert expected == actual
+
+
+def test_perform_renames_existing_destination_raises(tmp_path):
+    d = tmp_path / 'leaf3'
+    (d / 'img1.jpg').parent.mkdir(parents=True)
+    (d / 'img1.jpg').write_text('new')
+    # destination already exists and is not itself being renamed
+    (d / 'img01.jpg').write_text('old')
+
+    with pytest.raises(RuntimeError):
+        fus.perform_renames([(d / 'img1.jpg', d / 'img01.jpg')], dry_run=False)
+    # nothing was touched
+    assert (d / 'img1.jpg').read_text() == 'new'
+    assert (d / 'img01.jpg').read_text() == 'old'
+
+
+def test_perform_renames_force_overwrites(tmp_path):
+    d = tmp_path / 'leaf4'
+    d.mkdir()
+    (d / 'img1.jpg').write_text('new')
+    (d / 'img01.jpg').write_text('old')
+
+    succ, fail = fus.perform_renames([(d / 'img1.jpg', d / 'img01.jpg')],
+                                     dry_run=False, force=True)
+    assert (succ, fail) == (1, 0)
+    assert not (d / 'img1.jpg').exists()
+    assert (d / 'img01.jpg').read_text() == 'new'
+
+
+def test_perform_renames_chain_shift(tmp_path):
+    # n2.jpg is both a destination (of n1) and a source (of n3): the two-phase
+    # rename must not treat it as a foreign collision
+    d = tmp_path / 'leaf5'
+    d.mkdir()
+    (d / 'n1.jpg').write_text('one')
+    (d / 'n2.jpg').write_text('two')
+
+    mappings = [(d / 'n1.jpg', d / 'n2.jpg'), (d / 'n2.jpg', d / 'n3.jpg')]
+    succ, fail = fus.perform_renames(mappings, dry_run=False)
+    assert (succ, fail) == (2, 0)
+    assert not (d / 'n1.jpg').exists()
+    assert (d / 'n2.jpg').read_text() == 'one'
+    assert (d / 'n3.jpg').read_text() == 'two'
+
+
+def test_perform_renames_creates_missing_parent(tmp_path):
+    d = tmp_path / 'leaf6'
+    d.mkdir()
+    touch(d / 'img1.jpg')
+
+    dst = d / 'sub' / 'img01.jpg'
+    succ, fail = fus.perform_renames([(d / 'img1.jpg', dst)], dry_run=False)
+    assert (succ, fail) == (1, 0)
+    assert dst.exists()
+    assert not (d / 'img1.jpg').exists()
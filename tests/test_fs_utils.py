@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import _fs_utils as fsu
+
+
+def touch(p: Path):
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_text("x")
+
+
+def make_tree(root: Path):
+    # a has its own files but also files deeper down, so only a/b is a leaf;
+    # x is a leaf whose sibling subtree y/z also has files
+    touch(root / 'a' / 'top.jpg')
+    touch(root / 'a' / 'b' / 'p1.jpg')
+    touch(root / 'a' / 'b' / 'p2.jpg')
+    touch(root / 'x' / 'q1.jpg')
+    touch(root / 'y' / 'z' / 'r1.jpg')
+
+
+def test_walk_leafs_nested_and_siblings(tmp_path):
+    make_tree(tmp_path)
+
+    leafs = {d: sorted(e.name for e in entries) for d, entries in fsu.walk_leafs(tmp_path)}
+    assert set(leafs) == {tmp_path / 'a' / 'b', tmp_path / 'x', tmp_path / 'y' / 'z'}
+    assert leafs[tmp_path / 'a' / 'b'] == ['p1.jpg', 'p2.jpg']
+    assert leafs[tmp_path / 'x'] == ['q1.jpg']
+
+
+def test_walk_leafs_ignores_hidden_directories(tmp_path):
+    touch(tmp_path / 'leaf' / 'p1.jpg')
+    touch(tmp_path / 'leaf' / '.thumbs' / 'cache.jpg')
+    touch(tmp_path / '.git' / 'objects' / 'blob')
+
+    leafs = dict(fsu.walk_leafs(tmp_path))
+    # a hidden subtree neither becomes a leaf nor disqualifies its parent
+    assert set(leafs) == {tmp_path / 'leaf'}
+    assert [e.name for e in leafs[tmp_path / 'leaf']] == ['p1.jpg']
+
+
+def test_walk_leafs_include_empty(tmp_path):
+    (tmp_path / 'empty').mkdir()
+    assert fsu.walk_leafs(tmp_path) == []
+    leafs = dict(fsu.walk_leafs(tmp_path, include_empty=True))
+    assert tmp_path / 'empty' in leafs
+    assert leafs[tmp_path / 'empty'] == []
+
+
+def test_walk_leaf_names_matches_walk_leafs(tmp_path):
+    make_tree(tmp_path)
+    touch(tmp_path / '.hidden' / 'ignored.jpg')
+
+    by_entries = {d: sorted(e.name for e in entries) for d, entries in fsu.walk_leafs(tmp_path)}
+    by_names = {d: sorted(names) for d, names in fsu.walk_leaf_names(tmp_path)}
+    assert by_entries == by_names
+
+
+def test_subtree_has_files(tmp_path):
+    make_tree(tmp_path)
+
+    assert fsu.subtree_has_files(tmp_path)
+    assert fsu.subtree_has_files(tmp_path / 'a')
+    # a leaf's own files do not count as files below it
+    assert not fsu.subtree_has_files(tmp_path / 'a' / 'b')
+    assert not fsu.subtree_has_files(tmp_path / 'x')